@@ -16,49 +16,123 @@ def state_color_map(states):
 # Highcharts marker symbols we can use:
 # 'circle', 'square', 'diamond', 'triangle', 'triangle-down'
 PERCENTILE_MARKERS = {10: "circle", 25: "square", 50: "diamond", 75: "triangle", 90: "triangle-down"}
+# Lookup table from percentile code to marker; the last entry covers unlisted percentiles
+PERCENTILE_CODES = {p: code for code, p in enumerate(PERCENTILE_MARKERS)}
+PERCENTILE_SYMBOLS = np.array([*PERCENTILE_MARKERS.values(), "circle"])
 
-def make_point(row, color, is_selected):
-    """Create a Highcharts point dict with per-point marker and custom fields for tooltips."""
-    p = int(row["Percentile"])
-    symbol = PERCENTILE_MARKERS.get(p, "circle")
+def make_points(sdf, color, is_selected):
+    """Create Highcharts point dicts with per-point markers and custom fields for tooltips."""
+    # Pull the per-point fields column-wise as plain Python values (missing scores become None)
+    fields = zip(
+        sdf["Score.2019.Rounded"].to_numpy(dtype=object, na_value=None).tolist(),    # baseline score (x)
+        sdf["Score.Change.Rounded"].to_numpy(dtype=object, na_value=None).tolist(),  # change (y)
+        PERCENTILE_SYMBOLS[sdf["Percentile.Code"].to_numpy()].tolist(),
+        sdf["State.Label"].tolist(),
+        sdf["Percentile"].tolist(),
+        sdf["Score.2024.Rounded"].to_numpy(dtype=object, na_value=None).tolist(),
+    )
     # Larger radius if selected
     radius = 6 if is_selected else 4
-    return {
-        "x": float(np.rint(row["Score.2019"])),      # baseline score (x)
-        "y": float(np.rint(row["Score.Change"])),    # change (y)
-        "marker": {"symbol": symbol, "radius": radius, "lineColor": "black", "lineWidth": 1, "fillColor": color},
-        "color": color,
-        "custom": {
-            "state": f"{row['State']}{'*' if bool(row.get('significant', False)) else ''}",
-            "percentile": p,
-            "score2019": int(np.rint(row["Score.2019"])),
-            "score2024": int(np.rint(row["Score.2024"])),
-            "change": int(np.rint(row["Score.Change"])),
-        },
-    }
+    return [
+        {
+            "x": x,
+            "y": y,
+            "marker": {"symbol": symbol, "radius": radius, "lineColor": "black", "lineWidth": 1, "fillColor": color},
+            "color": color,
+            "custom": {
+                "state": state,
+                "percentile": percentile,
+                "score2019": x,
+                "score2024": score2024,
+                "change": y,
+            },
+        }
+        for x, y, symbol, state, percentile, score2024 in fields
+    ]
+
+@st.cache_data
+def load_data(url):
+    """Download and parse the data set once; reruns reuse the cached frame."""
+    df = pd.read_csv(url)
+    # Categorical columns turn filtering into integer-code comparisons
+    for col in ("Subject", "Grade", "State"):
+        df[col] = df[col].astype("category")
+    # Round scores once for display instead of per point (nullable, as scores may be missing)
+    for col in ("Score.2019", "Score.2024", "Score.Change"):
+        df[f"{col}.Rounded"] = df[col].round().astype("Int16")
+    # Narrower dtypes cut memory for the numeric columns
+    for col in ("Score.2019", "Score.2024", "Score.Change"):
+        df[col] = df[col].astype("float32")
+    df["Percentile"] = df["Percentile"].astype("int8")
+    # Integer code per percentile, used to index the marker lookup table
+    df["Percentile.Code"] = df["Percentile"].map(PERCENTILE_CODES).fillna(len(PERCENTILE_CODES)).astype("int8")
+    # Tooltip state label, marked with an asterisk if the difference is significant
+    sig = df["significant"].to_numpy(dtype=bool) if "significant" in df.columns else np.zeros(len(df), dtype=bool)
+    df["State.Label"] = df["State"].astype(str) + np.where(sig, "*", "")
+    return df
+
+@st.cache_data
+def filter_data(subject, grade):
+    """Rows for the given subject and grade, ordered by state and percentile."""
+    dff = df[(df.Subject == subject) & (df.Grade == grade)]
+    return dff.sort_values(["State", "Percentile"]).reset_index(drop=True)
+
+@st.cache_data
+def significance_flags(subject, grade):
+    """Whether each state has a significant 10th/90th percentile difference."""
+    dff = filter_data(subject, grade)
+    if "significant" not in dff.columns:
+        return {}
+    return dff.groupby("State", observed=True)["significant"].any().to_dict()
+
+@st.cache_data
+def score_ranges(subject, grade):
+    """Minimum and maximum of the baseline score and of the change, ignoring missing scores."""
+    dff = filter_data(subject, grade)
+    x = dff["Score.2019"].to_numpy()
+    y = dff["Score.Change"].to_numpy()
+    return float(np.nanmin(x)), float(np.nanmax(x)), float(np.nanmin(y)), float(np.nanmax(y))
+
+@st.cache_resource
+def group_data():
+    """Per-state frames keyed by (subject, grade, state), each ordered by percentile.
+
+    Cached as a shared resource, so the returned frames must not be modified.
+    """
+    groups = df.sort_values("Percentile").groupby(["Subject", "Grade", "State"], observed=True)
+    return {key: sdf.reset_index(drop=True) for key, sdf in groups}
+
+@st.cache_resource
+def load_text(path):
+    """Read a text file once and share its content across reruns and sessions."""
+    with open(path, "r") as file:
+        return file.read()
+
+@st.cache_resource
+def load_image(path):
+    """Read an image file once and share its bytes across reruns and sessions."""
+    with open(path, "rb") as file:
+        return file.read()
 
 # -------------------------
 # Load data & texts
 # -------------------------
 data_url = "https://raw.githubusercontent.com/katcast/DataProject/main/Data_for_App_v2.csv"
-df = pd.read_csv(data_url)
+df = load_data(data_url)
 
-subjects = sorted(df.Subject.unique())
-grades = sorted(df.Grade.unique())
-states = sorted(df.State.unique())
+subjects = list(df.Subject.cat.categories)
+grades = list(df.Grade.cat.categories)
+states = list(df.State.cat.categories)
 state_colors = state_color_map(states)
 
 # About this dashboard text
-with open("data/about.txt", "r") as file:
-    about_text = file.read()
+about_text = load_text("data/about.txt")
 
 # How-to text
-with open("data/howto.txt", "r") as file:
-    howto_text = file.read()
+howto_text = load_text("data/howto.txt")
 
 # Title text
-with open("data/title.txt", "r") as file:
-    title_text = file.read()
+title_text = load_text("data/title.txt")
 
 ALL_LABEL = "Show All States"
 SEL_LABEL = "Select States of Interest from Drop-Down Menu"
@@ -67,7 +141,7 @@ SEL_LABEL = "Select States of Interest from Drop-Down Menu"
 # Streamlit UI
 # -------------------------
 st.set_page_config(layout="wide")
-st.sidebar.image("data/logo.png", width=200)
+st.sidebar.image(load_image("data/logo.png"), width=200)
 st.sidebar.markdown("---")
 
 subject = st.sidebar.radio("Subject", subjects, index=subjects.index("Mathematics"))
@@ -95,8 +169,9 @@ st.markdown(about_text)
 
 st.text("")
 
-# Filter data
-dff = df[(df.Subject == subject) & (df.Grade == grade)]
+# Per-state data, significance flags and score ranges
+state_groups = group_data()
+sig_flags = significance_flags(subject, grade)
 
 if display_mode == SEL_LABEL and not selected_states:
     st.warning("Select one or more states to view data.")
@@ -106,12 +181,14 @@ else:
     # Build Highcharts series: one series per state with per-point markers
     series = []
     for state in states_to_show:
-        sdf = dff[dff.State == state].sort_values("Percentile")
-        significant_any = bool(sdf["significant"].any()) if "significant" in sdf.columns else False
+        sdf = state_groups.get((subject, grade, state))
+        if sdf is None:
+            continue
+        significant_any = sig_flags.get(state, False)
         color = state_colors[state]
         is_selected = state in selected_states
 
-        points = [make_point(row, color, is_selected) for _, row in sdf.iterrows()]
+        points = make_points(sdf, color, is_selected)
 
         series.append({
             "type": "line",
@@ -125,10 +202,11 @@ else:
         })
 
     # Axis ranges (pad slightly)
-    x_min = float(np.floor(dff["Score.2019"].min() - 2))
-    x_max = float(np.ceil(dff["Score.2019"].max() + 2))
-    y_min = float(np.floor(dff["Score.Change"].min() - 1))
-    y_max = float(np.ceil(dff["Score.Change"].max() + 1))
+    score_min, score_max, change_min, change_max = score_ranges(subject, grade)
+    x_min = float(np.floor(score_min - 2))
+    x_max = float(np.ceil(score_max + 2))
+    y_min = float(np.floor(change_min - 1))
+    y_max = float(np.ceil(change_max + 1))
 
     # Highcharts config
     options = {
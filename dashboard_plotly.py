@@ -1,39 +1,113 @@
+import base64
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 import streamlit as st
 
 
-def get_tooltip_data(row: pd.Series) -> pd.DataFrame:
-    """Data frame attached to each marker and used to display tooltip."""
-    data = [
-        f"{row['State']}{'*' if row['significant'] else ''}",
-        row["Percentile"],
-        [np.rint(row["Score.2019"])],
-        [np.rint(row["Score.2024"])],
-        [np.rint(row["Score.Change"])],
-    ]
-    index = range(len(data))
-    return pd.DataFrame(dict(zip(index, data)))
+@st.cache_data
+def load_data(url: str) -> pd.DataFrame:
+    """Download and parse the data set once; reruns reuse the cached frame."""
+    df = pd.read_csv(url)
+    # Categorical columns turn filtering into integer-code comparisons
+    for col in ("Subject", "Grade", "State"):
+        df[col] = df[col].astype("category")
+    # Round scores once for display instead of per point (nullable, as scores may be missing)
+    for col in ("Score.2019", "Score.2024", "Score.Change"):
+        df[f"{col}.Rounded"] = df[col].round().astype("Int16")
+    # Narrower dtypes cut memory for the numeric columns
+    for col in ("Score.2019", "Score.2024", "Score.Change"):
+        df[col] = df[col].astype("float32")
+    df["Percentile"] = df["Percentile"].astype("int8")
+    # Integer code per percentile, used to index the marker lookup table
+    df["Percentile.Code"] = df["Percentile"].map(percentile_codes).fillna(len(percentile_codes)).astype("int8")
+    # Tooltip state label, marked with an asterisk if the difference is significant
+    df["State.Label"] = df["State"].astype(str) + np.where(df["significant"], "*", "")
+    return df
+
+
+@st.cache_data
+def filter_data(subject: str, grade: int) -> pd.DataFrame:
+    """Rows for the given subject and grade, ordered by state and percentile."""
+    dff = df[(df.Subject == subject) & (df.Grade == grade)]
+    return dff.sort_values(["State", "Percentile"]).reset_index(drop=True)
+
+
+@st.cache_data
+def significance_flags(subject: str, grade: int) -> dict:
+    """Whether each state has a significant 10th/90th percentile difference."""
+    dff = filter_data(subject, grade)
+    return dff.groupby("State", observed=True)["significant"].any().to_dict()
+
+
+@st.cache_data
+def score_ranges(subject: str, grade: int) -> tuple[float, float, float, float]:
+    """Minimum and maximum of the baseline score and of the change, ignoring missing scores."""
+    dff = filter_data(subject, grade)
+    x = dff["Score.2019"].to_numpy()
+    y = dff["Score.Change"].to_numpy()
+    return float(np.nanmin(x)), float(np.nanmax(x)), float(np.nanmin(y)), float(np.nanmax(y))
+
+
+@st.cache_resource
+def group_data() -> dict:
+    """Per-state frames keyed by (subject, grade, state), each ordered by percentile.
+
+    Cached as a shared resource, so the returned frames must not be modified.
+    """
+    groups = df.sort_values("Percentile").groupby(["Subject", "Grade", "State"], observed=True)
+    return {key: sdf.reset_index(drop=True) for key, sdf in groups}
+
+
+@st.cache_resource
+def load_text(path: str) -> str:
+    """Read a text file once and share its content across reruns and sessions."""
+    with open(path, "r") as file:
+        return file.read()
+
+
+@st.cache_resource
+def load_image(path: str) -> bytes:
+    """Read an image file once and share its bytes across reruns and sessions."""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@st.cache_resource
+def load_image_base64(path: str) -> str:
+    """Base64-encode an image file once, for embedding as a data URI."""
+    return base64.b64encode(load_image(path)).decode()
+
+
+# Serialize figures with the faster orjson encoder
+pio.json.config.default_engine = "orjson"
+
+# Define markers for percentiles
+percentile_markers = {10: "circle", 25: "square", 50: "diamond", 75: "x", 90: "star"}
+
+# Lookup table from percentile code to marker; the last entry covers unlisted percentiles
+percentile_codes = {percentile: code for code, percentile in enumerate(percentile_markers)}
+percentile_symbols = np.array([*percentile_markers.values(), "circle"])
 
+# Legend images for percentile markers, embedded inline
+legend_images = {percentile: load_image_base64(f"data/P{percentile}.png") for percentile in percentile_markers}
 
 # Load data from GitHub
 data_url = "https://raw.githubusercontent.com/katcast/DataProject/main/Data_for_App_v2.csv"
-df = pd.read_csv(data_url)
+df = load_data(data_url)
 
 # Extract unique options
-subjects = sorted(df.Subject.unique())
-grades = sorted(df.Grade.unique())
-states = sorted(df.State.unique())
+subjects = list(df.Subject.cat.categories)
+grades = list(df.Grade.cat.categories)
+states = list(df.State.cat.categories)
 
 # Assign colors to states
 color_palette = px.colors.qualitative.Light24
 state_colors = {state: color_palette[i % len(color_palette)] for i, state in enumerate(states)}
 
-# Define markers for percentiles
-percentile_markers = {10: "circle", 25: "square", 50: "diamond", 75: "x", 90: "star"}
-
 # Template for mouse-over popover
 hovertemplate = (
     "<b>%{customdata[0]}</b><br>"
@@ -45,16 +119,13 @@ hovertemplate = (
 )
 
 # About this dashboard text
-with open("data/about.txt", "r") as file:
-    about_text = file.read()
+about_text = load_text("data/about.txt")
 
 # How-to text
-with open("data/howto.txt", "r") as file:
-    howto_text = file.read()
+howto_text = load_text("data/howto.txt")
 
 # Title text
-with open("data/title.txt", "r") as file:
-    title = file.read()
+title = load_text("data/title.txt")
 
 # Show all/selected labels
 all_label = "Show All States"
@@ -64,7 +135,7 @@ selected_label = "Select States of Interest from Drop-Down Menu"
 st.set_page_config(layout="wide")
 
 # Sidebar inputs
-st.sidebar.image("data/logo.png", width=200)
+st.sidebar.image(load_image("data/logo.png"), width=200)
 st.sidebar.markdown("---")
 subject = st.sidebar.radio("Subject", subjects, index=subjects.index("Mathematics"))
 grade = st.sidebar.radio("Grade", grades, index=grades.index(8))
@@ -93,53 +164,59 @@ help_container.info(howto_text, icon=":material/help:", width="stretch")
 # Spacer
 st.text("")
 
-# Filter data by subject and grade
-dff = df[(df.Subject == subject) & (df.Grade == grade)]
 
-# Initialize figure
-fig = go.Figure()
+@st.cache_resource(max_entries=64)
+def build_figure(subject: str, grade: int, states_to_show: tuple[str, ...]) -> go.Figure:
+    """Figure for the given subject, grade and states; rebuilt only for new selections.
+
+    Cached as a shared resource, so the returned figure must not be modified.
+    """
+    # Axis ranges for the current subject and grade
+    x_min, x_max, y_min, y_max = score_ranges(subject, grade)
+
+    # Per-state data, already ordered by percentiles
+    state_groups = group_data()
 
-if display_mode == selected_label and not selected_states:
-    st.warning("Select one or more states to view data.")
-else:
-    # States to show
-    states_to_show = selected_states if display_mode == selected_label else states
+    # Per-state significance, marked with an asterisk in the legend
+    sig_flags = significance_flags(subject, grade)
+
+    # Traces are collected as plain dicts and validated once when the figure is built
+    traces = []
 
     # Iterate over states to show
     for n, state in enumerate(states_to_show):
 
-        # Get data for current state and order by percentiles
-        sdf = dff[dff.State == state].sort_values("Percentile")
-
-        # Add markers with custom shapes for each percentile
-        for _, row in sdf.iterrows():
-            fig.add_trace(
-                go.Scatter(
-                    x=[row["Score.2019"]],
-                    y=[row["Score.Change"]],
-                    mode="markers",
-                    customdata=get_tooltip_data(row),
-                    hovertemplate=hovertemplate,
-                    showlegend=False,
-                    legendgroup=state,
-                    marker=dict(
-                        symbol=percentile_markers.get(row["Percentile"], "circle"),
-                        color=state_colors[state],
-                        size=14,
-                    ),
-                )
-            )
+        # Get data for current state
+        sdf = state_groups.get((subject, grade, state))
+        if sdf is None:
+            continue
 
-        # Draw lines connecting markers
-        fig.add_trace(
-            go.Scatter(
-                x=sdf["Score.2019"],
-                y=sdf["Score.Change"],
-                mode="lines",
-                name=f"{state}{'*' if sdf['significant'].any() else ''}",
+        # Markers with custom shapes for each percentile, connected by a line
+        symbols = percentile_symbols[sdf["Percentile.Code"].to_numpy()]
+        customdata = np.column_stack(
+            [
+                sdf["State.Label"].to_numpy(),
+                sdf["Percentile"].to_numpy(),
+                sdf["Score.2019.Rounded"].to_numpy(dtype="float64", na_value=np.nan),
+                sdf["Score.2024.Rounded"].to_numpy(dtype="float64", na_value=np.nan),
+                sdf["Score.Change.Rounded"].to_numpy(dtype="float64", na_value=np.nan),
+            ]
+        )
+        traces.append(
+            dict(
+                type="scattergl",
+                x=sdf["Score.2019"].to_numpy(),
+                y=sdf["Score.Change"].to_numpy(),
+                mode="lines+markers",
+                name=f"{state}{'*' if sig_flags.get(state, False) else ''}",
+                customdata=customdata,
+                hovertemplate=hovertemplate,
                 showlegend=True,
-                legendgroup=state,
-                hoverinfo="skip",
+                marker=dict(
+                    symbol=symbols,
+                    color=state_colors[state],
+                    size=14,
+                ),
                 line=dict(
                     color=state_colors[state],
                     width=3,
@@ -148,19 +225,23 @@ else:
         )
 
     # Customize figure
-    fig.update_layout(
+    layout = dict(
         xaxis=dict(
-            range=(dff["Score.2019"].min() - 2, dff["Score.2019"].max() + 2),
+            range=(x_min - 2, x_max + 2),
             tickfont=dict(size=16),
             showgrid=True,
+            title=dict(text="2019 Score (Baseline)", font=dict(size=18)),
         ),
         yaxis=dict(
-            range=(dff["Score.Change"].min() - 0.2, dff["Score.Change"].max() + 0.2),
+            range=(y_min - 0.2, y_max + 0.2),
             tickfont=dict(size=16),
             showgrid=True,
+            title=dict(text="Change (2024 Score Minus 2019 Score)", font=dict(size=18)),
+            # Highlight x-axis/zeroline
+            zeroline=True,
+            zerolinecolor="black",
+            zerolinewidth=2,
         ),
-        xaxis_title=dict(text="2019 Score (Baseline)", font=dict(size=18)),
-        yaxis_title=dict(text="Change (2024 Score Minus 2019 Score)", font=dict(size=18)),
         margin=dict(t=60),
         title=dict(text=f"{subject} Scores for Grade {grade}", font=dict(size=28)),
         legend=dict(font=dict(size=16)),
@@ -169,13 +250,32 @@ else:
         hoverlabel=dict(font_size=16),
     )
 
-    # Highlight x-axis/zeroline
-    fig.update_yaxes(zeroline=True, zerolinecolor="black", zerolinewidth=2)
+    # Build figure in one go instead of copying it on every add_trace
+    return go.Figure(dict(data=traces, layout=layout))
+
+
+def render_chart(subject: str, grade: int, display_mode: str, selected_states: list[str]) -> None:
+    """Draw the score-change chart and percentile legend for the current selection."""
+    if display_mode == selected_label and not selected_states:
+        st.warning("Select one or more states to view data.")
+    else:
+        # States to show
+        states_to_show = selected_states if display_mode == selected_label else states
+
+        # Build (or fetch cached) figure
+        fig = build_figure(subject, grade, tuple(states_to_show))
+
+        # Show figure
+        st.plotly_chart(fig, use_container_width=True, on_select="ignore")
+
+        # Add legend (Legend entries are just images. This is not great, but it works for now.)
+        cols = st.columns(6, gap="small")
+        for col, percentile in zip(cols[:-1], [10, 25, 50, 75, 90]):
+            col.markdown(
+                f'<img src="data:image/png;base64,{legend_images[percentile]}" width="178">',
+                unsafe_allow_html=True,
+            )
 
-    # Show figure
-    st.plotly_chart(fig, use_container_width=True, on_select="ignore")
 
-    # Add legend (Legend entries are just images. This is not great, but it works for now.)
-    cols = st.columns(6, gap="small")
-    for col, percentile in zip(cols[:-1], [10, 25, 50, 75, 90]):
-        col.image(f"data/P{percentile}.png", width=178)
+# Chart
+render_chart(subject, grade, display_mode, selected_states)